@@ -6,11 +6,16 @@ users can import directly from `ocr4all_ajax_client`.
 """
 
 from .ocr4all_ajax_utils import (
+    build_session,
+    invalidate_ocr4all_cache,
     ocr4all_open_project,
     ocr4all_get_page_ids,
     ocr4all_threads,
     ocr4all_processflow_execute,
     ocr4all_processflow_execute_json,
+    ocr4all_processflow_execute_batched,
+    ocr4all_execute_batch,
+    make_execute_caller,
     ocr4all_processflow_wait,
     ocr4all_checkpdf,
     ocr4all_convert_project_files,
@@ -18,11 +23,16 @@ from .ocr4all_ajax_utils import (
 )
 
 __all__ = [
+    "build_session",
+    "invalidate_ocr4all_cache",
     "ocr4all_open_project",
     "ocr4all_get_page_ids",
     "ocr4all_threads",
     "ocr4all_processflow_execute",
     "ocr4all_processflow_execute_json",
+    "ocr4all_processflow_execute_batched",
+    "ocr4all_execute_batch",
+    "make_execute_caller",
     "ocr4all_processflow_wait",
     "ocr4all_checkpdf",
     "ocr4all_convert_project_files",
@@ -1,10 +1,14 @@
 """
 Logger configuration.
 """
+import atexit
 import logging
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 import os
+import queue
 import sys
+import threading
+from types import SimpleNamespace
 
 
 LOGGER_NAME = "ocr4all_ajax"
@@ -19,28 +23,100 @@ formatter = logging.Formatter(
     datefmt="%Y-%m-%d %H:%M:%S"
 )
 
-# Prevent duplicate handlers if already added (e.g. on reload)
-if not logger.handlers:
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.DEBUG)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # Rolling file handler
-    logs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
-    os.makedirs(logs_dir, exist_ok=True)
-    log_file = os.path.join(logs_dir, LOGGER_NAME + ".log")
-
-    file_handler = TimedRotatingFileHandler(
-        filename=log_file,
-        when="midnight",
-        interval=1,
-        backupCount=14,
-        encoding="utf-8",
-        utc=False  # set True if you prefer UTC cutover
-    )
-
-    file_handler.setLevel(logging.DEBUG)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+_configure_lock = threading.Lock()
+
+# Queue handler and listener writing queued records to the log file; see configure_logger()
+_FILE_LOGGING = SimpleNamespace(queue_handler=None, listener=None)
+
+
+def _stop_listener() -> None:
+    if _FILE_LOGGING.listener is not None:
+        _FILE_LOGGING.listener.stop()
+
+
+def _acquire_file_handlers() -> None:
+    """ Holds the file handlers' locks across fork(), so it does not happen in the middle of a write. """
+    if _FILE_LOGGING.listener is not None:
+        for handler in _FILE_LOGGING.listener.handlers:
+            handler.acquire()
+
+
+def _release_file_handlers() -> None:
+    if _FILE_LOGGING.listener is not None:
+        for handler in reversed(_FILE_LOGGING.listener.handlers):
+            handler.release()
+
+
+def _restart_listener_in_child() -> None:
+    """
+    Threads do not survive fork(), so the forked child needs its own listener thread.
+
+    The child also gets its own queue: records the parent queued before the fork are
+    written by the parent only, not a second time by the child.
+    """
+    global _configure_lock  # pylint: disable=global-statement
+    _configure_lock = threading.Lock()
+    if _FILE_LOGGING.listener is not None:
+        for handler in _FILE_LOGGING.listener.handlers:
+            handler.createLock()
+        log_queue = queue.SimpleQueue()
+        _FILE_LOGGING.queue_handler.queue = log_queue
+        _FILE_LOGGING.listener = QueueListener(log_queue, *_FILE_LOGGING.listener.handlers, respect_handler_level=True)
+        _FILE_LOGGING.listener.start()
+
+
+def configure_logger() -> logging.Logger:
+    """
+    Adds the console and (queued) rolling file handlers to the global logger.
+
+    Safe to call repeatedly and from several threads: handlers are only added once
+    (e.g. not again on reload), so the log file is not re-opened.
+
+    Returns:
+        The configured logger.
+    """
+    with _configure_lock:
+        # Prevent duplicate handlers if already added (e.g. on reload)
+        if logger.handlers:
+            return logger
+
+        # Console handler
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setLevel(logging.DEBUG)
+        console_handler.setFormatter(formatter)
+        logger.addHandler(console_handler)
+
+        # Rolling file handler
+        logs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs")
+        os.makedirs(logs_dir, exist_ok=True)
+        log_file = os.path.join(logs_dir, LOGGER_NAME + ".log")
+
+        file_handler = TimedRotatingFileHandler(
+            filename=log_file,
+            when="midnight",
+            interval=1,
+            backupCount=14,
+            encoding="utf-8",
+            utc=False  # set True if you prefer UTC cutover
+        )
+
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(formatter)
+
+        # Write the log file from a background thread, so logging does not block on disk I/O
+        log_queue = queue.SimpleQueue()
+        _FILE_LOGGING.queue_handler = QueueHandler(log_queue)
+        logger.addHandler(_FILE_LOGGING.queue_handler)
+        _FILE_LOGGING.listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        _FILE_LOGGING.listener.start()
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(
+                before=_acquire_file_handlers,
+                after_in_parent=_release_file_handlers,
+                after_in_child=_restart_listener_in_child,
+            )
+        return logger
+
+
+configure_logger()
@@ -6,15 +6,46 @@ performed via AJAX calls. This module provides Python functions to invoke these
 AJAX endpoints, mimicking the behavior of the OCR4All web UI.
 """
 
+import contextlib
+import copy
+import functools
 import json
 import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import time
-from typing import Any, Dict, List
+import weakref
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from requests.cookies import get_cookie_header
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError, SSLError
+from urllib3.util.retry import Retry
 
-from logger import logger
+from .logger import logger
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if orjson is not None:
+    def _dumps(payload: Any) -> bytes:
+        """ Serializes payload to compact UTF-8 JSON. """
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+else:
+    _ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def _dumps(payload: Any) -> bytes:
+        """ Serializes payload to compact UTF-8 JSON. """
+        return _ENCODER.encode(payload).encode("utf-8")
+
+_loads: Callable[[bytes], Any] = orjson.loads if orjson is not None else json.loads
+
+_JSON_CONTENT_TYPE = "application/json; charset=utf-8"
 
 load_dotenv()
 
@@ -22,6 +53,111 @@ OCR4ALL_EXEC_TIMEOUT_S = int(os.getenv("OCR4ALL_EXEC_TIMEOUT_S", "60"))
 OCR4ALL_WAIT_TIMEOUT_S = int(os.getenv("OCR4ALL_WAIT_TIMEOUT_S", "3600"))
 OCR4ALL_HTTP_TIMEOUT_S = int(os.getenv("OCR4ALL_HTTP_TIMEOUT_S", "30"))
 
+_ORIGIN = os.getenv("OCR4ALL_ORIGIN", "http://ocr4all:8080")
+_REFERER = os.getenv("OCR4ALL_REFERER")  # defaults to {base_url}/ProcessFlow
+
+# Cookies the server uses to track the session (and thereby the opened project)
+_SESSION_COOKIES = ("JSESSIONID", "SESSION")
+
+_URL_CHECK_DIR = "/ajax/overview/checkDir"
+_URL_VALIDATE = "/ajax/overview/validate"
+_URL_VALIDATE_PROJECT = "/ajax/overview/validateProject"
+_URL_INVALIDATE_SESSION = "/ajax/overview/invalidateSession"
+_URL_CHECKPDF = "/ajax/overview/checkpdf"
+_URL_CONVERT_PROJECT_FILES = "/ajax/overview/convertProjectFiles"
+_URL_PAGELIST = "/ajax/generic/pagelist"
+_URL_THREADS = "/ajax/generic/threads"
+_URL_EXECUTE = "/ajax/processFlow/execute"
+_URL_CURRENT = "/ajax/processFlow/current"
+
+# Shared pool for requests that are issued concurrently, so threads are not recreated per call
+_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix="ocr4all_ajax")
+
+OCR4ALL_CACHE_TTL_S = int(os.getenv("OCR4ALL_CACHE_TTL_S", "300"))
+
+# session -> {(function name, *args): (expiry timestamp, value)}; entries vanish with their session
+_CACHE: "weakref.WeakKeyDictionary[requests.Session, Dict[Tuple[Any, ...], Tuple[float, Any]]]" = \
+    weakref.WeakKeyDictionary()
+# session -> number of invalidations, so results fetched across an invalidation are not stored
+_CACHE_GENERATIONS: "weakref.WeakKeyDictionary[requests.Session, int]" = weakref.WeakKeyDictionary()
+_CACHE_LOCK = threading.Lock()
+_CACHE_MAXSIZE = 64  # per session
+
+
+def _ttl_cache(ttl: float) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Memoizes a function taking a requests.Session as first argument for `ttl` seconds.
+
+    Entries are stored per session, so they can be dropped with invalidate_ocr4all_cache().
+    """
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(session: requests.Session, *args: Any, **kwargs: Any) -> Any:
+            key = (func.__name__, *args, *sorted(kwargs.items()))
+            now = time.monotonic()
+            with _CACHE_LOCK:
+                hit = _CACHE.get(session, {}).get(key)
+                generation = _CACHE_GENERATIONS.get(session, 0)
+            if hit is not None and hit[0] > now:
+                return copy.copy(hit[1])
+
+            value = func(session, *args, **kwargs)
+            with _CACHE_LOCK:
+                # Invalidated while fetching: the value may already be stale, don't store it
+                if _CACHE_GENERATIONS.get(session, 0) == generation:
+                    entries = _CACHE.setdefault(session, {})
+                    # Re-insert at the end, so dict order is the order of last store
+                    entries.pop(key, None)
+                    if len(entries) >= _CACHE_MAXSIZE:
+                        # Drop expired entries first, then the oldest ones
+                        expired = [k for k, (exp, _) in entries.items() if exp <= now]
+                        for k in expired or list(entries)[:len(entries) // 2]:
+                            del entries[k]
+                    entries[key] = (now + ttl, value)
+            return copy.copy(value)
+        return wrapper
+    return decorator
+
+
+def invalidate_ocr4all_cache(session: requests.Session) -> None:
+    """
+    Drops all cached responses (threads, page lists) for the given session.
+
+    Called automatically by the functions that change the opened project or its pages,
+    and whenever a process flow is observed to have finished.
+
+    Args:
+        session: requests.Session the responses were cached for.
+    """
+    with _CACHE_LOCK:
+        _CACHE.pop(session, None)
+        _CACHE_GENERATIONS[session] = _CACHE_GENERATIONS.get(session, 0) + 1
+
+
+def build_session(pool_connections: int = 16, pool_maxsize: int = 64) -> requests.Session:
+    """
+    Creates a requests.Session suited for talking to OCR4all.
+
+    Connections are pooled and kept alive, so repeated calls do not pay for new
+    TCP/TLS handshakes. Connection errors are retried with a short backoff.
+
+    Args:
+        pool_connections: (optional) Number of connection pools to cache.
+        pool_maxsize: (optional) Maximum number of connections per pool.
+
+    Returns:
+        Configured requests.Session.
+    """
+    session = requests.Session()
+    for prefix in ("http://", "https://"):
+        session.mount(prefix, HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=3, connect=3, read=0, status=0, backoff_factor=0.3),
+        ))
+    session.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip, deflate"})
+    return session
+
 
 def ocr4all_open_project(
         session: requests.Session,
@@ -29,6 +165,7 @@ def ocr4all_open_project(
         project_dir: str,
         image_type: str = "Original",
         reset_session: bool = True,
+        parallel: bool = False,
 ) -> None:
     """
     Opens an OCR4all project.
@@ -39,53 +176,99 @@ def ocr4all_open_project(
       3) ajax/overview/validateProject
 
     Args:
-        session: requests.Session with cookies etc.
+        session: requests.Session with cookies etc. (preferably from build_session())
         base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
         project_dir: Project directory
         image_type: Image type to use
         reset_session: Whether to reset session state
+        parallel: (optional) Issue steps 1) and 2) concurrently, saving one round-trip.
+            Only use this if your OCR4all version does not validate the session state
+            written by checkDir (the web UI calls them one after another).
 
     Raises:
         RuntimeError: If any step fails
     """
-    # Ensure session cookie exists
-    session.get(f"{base_url}/", timeout=OCR4ALL_HTTP_TIMEOUT_S).raise_for_status()
+    invalidate_ocr4all_cache(session)
+
+    # Ensure session cookie exists (skipped if the session was used before)
+    if not _has_session_cookie(session, base_url):
+        session.get(f"{base_url}/", timeout=OCR4ALL_HTTP_TIMEOUT_S).raise_for_status()
+
+    if parallel:
+        futures = [
+            _POOL.submit(_open_project_check_dir, session, base_url, project_dir, image_type, reset_session),
+            _POOL.submit(_open_project_validate, session, base_url),
+        ]
+        try:
+            for fut in futures:
+                fut.result()
+        except BaseException:
+            for fut in futures:
+                fut.cancel()
+            raise
+    else:
+        _open_project_check_dir(session, base_url, project_dir, image_type, reset_session)
+        _open_project_validate(session, base_url)
 
-    # 1) checkDir
+    # 3) validateProject
     r = session.get(
-        f"{base_url}/ajax/overview/checkDir",
-        params={
-            "projectDir": project_dir,
-            "imageType": image_type,
-            "resetSession": str(reset_session).lower(),
-        },
+        f"{base_url}{_URL_VALIDATE_PROJECT}",
+        params={"projectDir": project_dir, "imageType": image_type},
         timeout=OCR4ALL_HTTP_TIMEOUT_S,
     )
     r.raise_for_status()
     if r.text.strip() != "true":
-        raise RuntimeError(f"ocr4all checkDir returned {r.text!r} for projectDir={project_dir}")
+        raise RuntimeError(
+            f"ocr4all validateProject returned:\n {r.text!r}"
+        )
 
-    # 2) validate
-    r = session.get(f"{base_url}/ajax/overview/validate", timeout=OCR4ALL_HTTP_TIMEOUT_S)
-    r.raise_for_status()
-    if r.text.strip() != "true":
-        # UI does invalidateSession here
-        session.get(f"{base_url}/ajax/overview/invalidateSession", timeout=OCR4ALL_HTTP_TIMEOUT_S)
-        raise RuntimeError(f"ocr4all validate returned {r.text!r}")
 
-    # 3) validateProject
+def _has_session_cookie(session: requests.Session, base_url: str) -> bool:
+    """ Whether the session holds a session cookie that would be sent to base_url. """
+    header = get_cookie_header(session.cookies, requests.Request("GET", f"{base_url}/"))
+    if not header:
+        return False
+    return any(c.split("=", 1)[0].strip() in _SESSION_COOKIES for c in header.split(";"))
+
+
+def _check_dir_params(project_dir: str, image_type: str, reset_session: bool) -> Dict[str, str]:
+    """ Query parameters of ajax/overview/checkDir. """
+    return {
+        "projectDir": project_dir,
+        "imageType": image_type,
+        "resetSession": str(reset_session).lower(),
+    }
+
+
+def _open_project_check_dir(
+        session: requests.Session,
+        base_url: str,
+        project_dir: str,
+        image_type: str,
+        reset_session: bool,
+) -> None:
+    """ Step 1) of ocr4all_open_project: ajax/overview/checkDir """
     r = session.get(
-        f"{base_url}/ajax/overview/validateProject",
-        params={"projectDir": project_dir, "imageType": image_type},
+        f"{base_url}{_URL_CHECK_DIR}",
+        params=_check_dir_params(project_dir, image_type, reset_session),
         timeout=OCR4ALL_HTTP_TIMEOUT_S,
     )
     r.raise_for_status()
     if r.text.strip() != "true":
-        raise RuntimeError(
-            f"ocr4all validateProject returned:\n {r.text!r}"
-        )
+        raise RuntimeError(f"ocr4all checkDir returned {r.text!r} for projectDir={project_dir}")
 
 
+def _open_project_validate(session: requests.Session, base_url: str) -> None:
+    """ Step 2) of ocr4all_open_project: ajax/overview/validate """
+    r = session.get(f"{base_url}{_URL_VALIDATE}", timeout=OCR4ALL_HTTP_TIMEOUT_S)
+    r.raise_for_status()
+    if r.text.strip() != "true":
+        # UI does invalidateSession here
+        session.get(f"{base_url}{_URL_INVALIDATE_SESSION}", timeout=OCR4ALL_HTTP_TIMEOUT_S)
+        raise RuntimeError(f"ocr4all validate returned {r.text!r}")
+
+
+@_ttl_cache(ttl=OCR4ALL_CACHE_TTL_S)
 def ocr4all_get_page_ids(
         session: requests.Session,
         base_url: str,
@@ -94,48 +277,67 @@ def ocr4all_get_page_ids(
     """
     Retrieves the list of page IDs for the specified image type.
 
+    Results are cached per session for OCR4ALL_CACHE_TTL_S seconds.
+
     Args:
-        session: requests.Session with cookies etc.
+        session: requests.Session with cookies etc. (preferably from build_session())
         base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
         param image_type: Image type to use
 
     Returns:
-        List of page IDs.
+        List of page IDs. Each call returns a new list (a copy of the cached one).
     """
     r = session.get(
-        f"{base_url}/ajax/generic/pagelist",
+        f"{base_url}{_URL_PAGELIST}",
         params={"imageType": image_type},
+        headers={"Accept-Encoding": "gzip"},
         timeout=OCR4ALL_HTTP_TIMEOUT_S,
     )
     r.raise_for_status()
+    return _parse_page_ids(r.content)
+
 
+def _parse_page_ids(content: bytes) -> List[str]:
+    """ Parses the pagelist response body. """
     # OCR4all returns JSON array, e.g. ["0001", "0002", ...] or []
     try:
-        data = r.json()
+        # The raw bytes are parsed directly, without decoding to str first
+        data = _loads(content)
     except Exception as e:
-        raise RuntimeError(f"pagelist did not return JSON. head={r.text[:200]!r}") from e
+        raise RuntimeError(f"pagelist did not return JSON. head={content[:200]!r}") from e
 
     if not isinstance(data, list):
         raise RuntimeError(f"Unexpected pagelist payload: {type(data)} {str(data)[:200]}")
 
+    # Usual case: page IDs are already strings, so no conversion is needed
+    if all(isinstance(x, str) for x in data):
+        return data
     return [str(x) for x in data]
 
 
+@_ttl_cache(ttl=OCR4ALL_CACHE_TTL_S)
 def ocr4all_threads(session: requests.Session, base_url: str) -> int:
     """
     Retrieves the number of threads configured in OCR4all.
 
+    Results are cached per session for OCR4ALL_CACHE_TTL_S seconds.
+
     Args:
-        session: requests.Session with cookies etc.
+        session: requests.Session with cookies etc. (preferably from build_session())
         base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
 
     Returns:
         Number of threads.
     """
-    r = session.get(f"{base_url}/ajax/generic/threads", timeout=OCR4ALL_HTTP_TIMEOUT_S)
+    r = session.get(f"{base_url}{_URL_THREADS}", timeout=OCR4ALL_HTTP_TIMEOUT_S, stream=True)
     r.raise_for_status()
+    return _parse_threads(_read_head(r, 64))
+
+
+def _parse_threads(text: str) -> int:
+    """ Parses the threads response body, falling back to a single thread. """
     try:
-        return max(1, int(r.text.strip()))
+        return max(1, int(text.strip()))
     except Exception:
         return 1
 
@@ -151,7 +353,7 @@ def ocr4all_processflow_execute(
     Executes the OCR4all process flow.
 
     Args:
-        session: requests.Session with cookies etc.
+        session: requests.Session with cookies etc. (preferably from build_session())
         base_url: Base URL of OCR4all server, e.g. "http://ocr
         page_ids: List of page IDs to process.
         processes: List of process steps to execute.
@@ -160,57 +362,230 @@ def ocr4all_processflow_execute(
     Raises:
         RuntimeError: If the execution fails (HTTP status != 200).
     """
-    payload = {
-        "pageIds": page_ids,
-        "processesToExecute": processes,
-        "processSettings": process_settings,
-    }
+    payload = _execute_payload(page_ids, processes, process_settings)
+    invalidate_ocr4all_cache(session)
     r = session.post(
-        f"{base_url}/ajax/processFlow/execute",
-        headers={"Accept": "application/json", "Content-Type": "application/json"},
-        data=json.dumps(payload),
+        f"{base_url}{_URL_EXECUTE}",
+        headers={"Accept": "application/json", "Content-Type": _JSON_CONTENT_TYPE},
+        data=_dumps(payload),
         timeout=OCR4ALL_EXEC_TIMEOUT_S,
     )
     if r.status_code != 200:
         raise RuntimeError(f"processFlow/execute failed: HTTP {r.status_code}: {r.text[:500]}")
 
 
+def make_execute_caller(
+        session: requests.Session,
+        base_url: str,
+        processes: List[str],
+        process_settings: Dict[str, Any],
+) -> Callable[[List[str]], None]:
+    """
+    Prepares ocr4all_processflow_execute() for a fixed pipeline run over many page lists.
+
+    The invariant part of the payload (processes and settings) is serialized once;
+    each call only serializes the page IDs.
+
+    Args:
+        session: requests.Session with cookies etc. (preferably from build_session())
+        base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
+        processes: List of process steps to execute.
+        process_settings: Dictionary of process settings.
+
+    Returns:
+        Function taking a list of page IDs, raising RuntimeError if the execution fails.
+    """
+    url = f"{base_url}{_URL_EXECUTE}"
+    headers = {"Accept": "application/json", "Content-Type": _JSON_CONTENT_TYPE}
+    suffix = b',"processesToExecute":' + _dumps(processes) + b',"processSettings":' + _dumps(process_settings) + b"}"
+
+    def execute(page_ids: List[str]) -> None:
+        invalidate_ocr4all_cache(session)
+        r = session.post(
+            url,
+            headers=headers,
+            data=b'{"pageIds":' + _dumps(page_ids) + suffix,
+            timeout=OCR4ALL_EXEC_TIMEOUT_S,
+        )
+        if r.status_code != 200:
+            raise RuntimeError(f"processFlow/execute failed: HTTP {r.status_code}: {r.text[:500]}")
+
+    return execute
+
+
+def ocr4all_processflow_execute_batched(
+        session: requests.Session,
+        base_url: str,
+        batches: Sequence[Tuple[List[str], List[str], Dict[str, Any]]],
+) -> None:
+    """
+    Executes several process flow submissions with as few requests as possible.
+
+    Consecutive batches with identical processes and process settings are merged
+    into a single processFlow/execute call by uniting their page IDs (in order of
+    appearance). Batches are never merged across a batch with different processes or
+    settings, so every page sees the submitted steps in the submitted order.
+    OCR4all runs one process flow at a time, so it waits for the previous flow to
+    finish before submitting the next merged batch.
+
+    Args:
+        session: requests.Session with cookies etc. (preferably from build_session())
+        base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
+        batches: Tuples of (page_ids, processes, process_settings).
+
+    Raises:
+        RuntimeError: If an execution fails (HTTP status != 200).
+    """
+    merged: List[Tuple[str, Dict[str, None], List[str], Dict[str, Any]]] = []
+    for page_ids, processes, process_settings in batches:
+        # Key on the JSON the server will receive (as posted by _dumps), with normalized key order
+        key = json.dumps(json.loads(_dumps([processes, process_settings])), sort_keys=True)
+        if not merged or merged[-1][0] != key:
+            merged.append((key, {}, processes, process_settings))
+        merged[-1][1].update(dict.fromkeys(page_ids))
+
+    for i, (_, page_ids, processes, process_settings) in enumerate(merged):
+        if i > 0:
+            ocr4all_processflow_wait(session, base_url)
+        ocr4all_processflow_execute(session, base_url, list(page_ids), processes, process_settings)
+
+
+class _ExecuteBatch:
+    """ Collects process flow submissions for ocr4all_execute_batch(). """
+
+    def __init__(self, session: requests.Session, base_url: str):
+        self._session = session
+        self._base_url = base_url
+        self._batches: List[Tuple[List[str], List[str], Dict[str, Any]]] = []
+
+    def add(self, page_ids: List[str], processes: List[str], process_settings: Dict[str, Any]) -> None:
+        """ Queues a submission. See ocr4all_processflow_execute(). """
+        self._batches.append((page_ids, processes, process_settings))
+
+    def flush(self) -> None:
+        """ Executes all queued submissions, see ocr4all_processflow_execute_batched(). """
+        batches, self._batches = self._batches, []
+        if batches:
+            ocr4all_processflow_execute_batched(self._session, self._base_url, batches)
+
+
+@contextlib.contextmanager
+def ocr4all_execute_batch(session: requests.Session, base_url: str, flush: bool = True) -> Iterator[_ExecuteBatch]:
+    """
+    Collects process flow submissions and executes them when the block is left, merging
+    consecutive submissions with identical processes and settings.
+
+    Example:
+        with ocr4all_execute_batch(session, base_url) as batch:
+            for page_id in page_ids:
+                batch.add([page_id], processes, process_settings)
+
+    Args:
+        session: requests.Session with cookies etc. (preferably from build_session())
+        base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
+        flush: (optional) Execute the queued submissions when the block exits without an exception.
+            Otherwise call batch.flush() explicitly.
+    """
+    batch = _ExecuteBatch(session, base_url)
+    yield batch
+    if flush:
+        batch.flush()
+
+
 def ocr4all_processflow_wait(
         session: requests.Session,
         base_url: str,
         timeout_s: int = OCR4ALL_WAIT_TIMEOUT_S,
+        initial_sleep_s: float = 0.5,
+        max_sleep_s: float = 15.0,
+        use_long_poll: bool = False,
 ) -> None:
     """
     Waits for the OCR4all process flow to complete.
 
+    The current step is polled by a single background thread per session and base URL
+    (shared by all concurrent waiters). The polling interval grows exponentially (with a
+    small random jitter) while the current step does not change, and is reset whenever
+    progress is observed.
+
     Args:
-        session: requests.Session with cookies etc.
+        session: requests.Session with cookies etc. (preferably from build_session())
         base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
         timeout_s: Maximum time to wait in seconds.
+        initial_sleep_s: (optional) Initial polling interval in seconds. Ignored if another
+            caller is already waiting on the same session and base URL.
+        max_sleep_s: (optional) Maximum polling interval in seconds. Ignored likewise.
+        use_long_poll: (optional) First try a single long-lived request (hanging GET or
+            server-sent events). Falls back to polling if the server does not support it.
     """
     t0 = time.time()
-    last = None
-    while True:
-        cur = ocr4all_processflow_current(session, base_url)
+    if use_long_poll and _processflow_wait_long_poll(session, base_url, timeout_s):
+        # Pages may have changed while the flow was running
+        invalidate_ocr4all_cache(session)
+        return
 
-        if cur != last:
-            logger.info(f"OCR4all current: {cur!r}")
-            last = cur
+    _FlowMonitor.wait_idle(session, base_url, timeout_s - (time.time() - t0), initial_sleep_s, max_sleep_s)
 
-        if cur == "":
-            return
 
-        if time.time() - t0 > timeout_s:
-            raise TimeoutError("Timed out waiting for OCR4all process flow to finish")
+def _processflow_wait_long_poll(session: requests.Session, base_url: str, timeout_s: float) -> bool:
+    """
+    Waits for the process flow to become idle using a single long-lived request.
 
-        time.sleep(1)
+    Supports both a hanging GET (one line per step, empty line when idle) and
+    server-sent events (`data:` frames, empty data when idle).
+
+    Returns:
+        True if idle was observed, False if the server does not support long-polling
+        and the caller should fall back to regular polling.
+    """
+    try:
+        r = session.get(
+            f"{base_url}{_URL_CURRENT}",
+            params={"wait": "1"},
+            headers={"Accept": "text/event-stream, text/plain"},
+            timeout=(OCR4ALL_HTTP_TIMEOUT_S, timeout_s),
+            stream=True,
+        )
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"processFlow/current long-poll failed ({e}); falling back to polling.")
+        return False
+
+    with r:
+        if r.status_code == 404:
+            return False
+        r.raise_for_status()
+
+        is_sse = r.headers.get("Content-Type", "").startswith("text/event-stream")
+        last = None
+        try:
+            for line in r.iter_lines(decode_unicode=True):
+                if is_sse:
+                    if not line.startswith("data:"):
+                        continue
+                    cur = line[len("data:"):].strip()
+                else:
+                    cur = line.strip()
+
+                if cur != last:
+                    logger.info(f"OCR4all current: {cur!r}")
+                    last = cur
+
+                if cur == "":
+                    return True
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"processFlow/current long-poll interrupted ({e}); falling back to polling.")
+            return False
+
+    # Plain endpoint answered immediately: an empty body means idle, anything else
+    # means the server does not hang the request.
+    return last is None and not is_sse
 
 
 def ocr4all_checkpdf(session: requests.Session, base_url: str) -> bool:
     """ Checks if the project contains PDF files which need to be converted to images. """
-    r = session.get(f"{base_url}/ajax/overview/checkpdf", timeout=OCR4ALL_HTTP_TIMEOUT_S)
+    r = session.get(f"{base_url}{_URL_CHECKPDF}", timeout=OCR4ALL_HTTP_TIMEOUT_S, stream=True)
     r.raise_for_status()
-    return r.text.strip().lower() == "true"
+    return _read_head(r, 64).strip().lower() == "true"
 
 
 def ocr4all_convert_project_files(session: requests.Session, base_url, delete_blank: bool, dpi: int,
@@ -224,23 +599,25 @@ def ocr4all_convert_project_files(session: requests.Session, base_url, delete_bl
       - tolerate ReadTimeout and continue (conversion might still be running server-side)
 
     Args:
-        session: requests.Session with cookies etc.
+        session: requests.Session with cookies etc. (preferably from build_session())
         base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
         delete_blank: Whether to delete blank pages.
         dpi: DPI for conversion.
         timeout_s: HTTP timeout in seconds.
 
     Returns:
-        Server response text, or empty string if timeout occurred.
+        Server response text (at most the first 4096 bytes), or empty string if timeout occurred.
     """
+    invalidate_ocr4all_cache(session)
     try:
         r = session.post(
-            f"{base_url}/ajax/overview/convertProjectFiles",
+            f"{base_url}{_URL_CONVERT_PROJECT_FILES}",
             data={"deleteBlank": str(delete_blank).lower(), "dpi": str(int(dpi))},
             timeout=timeout_s,
+            stream=True,
         )
         r.raise_for_status()
-        return r.text
+        return _read_head(r, 4096)
     except requests.exceptions.ReadTimeout:
         # OCR4all often keeps converting even if the HTTP response doesn't arrive in time.
         logger.warning(
@@ -251,9 +628,170 @@ def ocr4all_convert_project_files(session: requests.Session, base_url, delete_bl
 
 def ocr4all_processflow_current(session: requests.Session, base_url: str) -> str:
     """ Returns current process flow step. Empty string if idle. """
-    r = session.get(f"{base_url}/ajax/processFlow/current", timeout=OCR4ALL_HTTP_TIMEOUT_S)
+    r = session.get(f"{base_url}{_URL_CURRENT}", timeout=OCR4ALL_HTTP_TIMEOUT_S, stream=True)
     r.raise_for_status()
-    return r.text.strip()
+    return _read_head(r, 256).strip()
+
+
+class _FlowMonitor:
+    """
+    Polls processFlow/current in a single daemon thread and notifies all waiting callers.
+
+    One monitor exists per session and base URL. The thread is started lazily by the
+    first waiter and stops once no caller is waiting anymore. The polling intervals are
+    those of the waiter that started the thread; later waiters share its cadence.
+    """
+
+    _instances: Dict[Tuple[int, str], "_FlowMonitor"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, session: requests.Session, base_url: str, initial_sleep_s: float, max_sleep_s: float):
+        self._target = (session, base_url)
+        self._sleep_s = (initial_sleep_s, max_sleep_s)
+
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._refcount = 0
+        # "idle", "in_flight" or "stale" (a waiter arrived while the poll was in flight,
+        # so its result predates that waiter and another poll is due right away)
+        self._poll_state = "idle"
+        # (generation, current step, error); the generation is incremented after every poll
+        self._result: Tuple[int, Optional[str], Optional[Exception]] = (0, None, None)
+
+    @classmethod
+    def wait_idle(
+            cls,
+            session: requests.Session,
+            base_url: str,
+            timeout_s: float,
+            initial_sleep_s: float = 0.5,
+            max_sleep_s: float = 15.0,
+    ) -> None:
+        """
+        Blocks until a poll started after this call reports OCR4all as idle.
+
+        initial_sleep_s and max_sleep_s only apply if no other caller is already
+        waiting on the same session and base URL.
+
+        Raises:
+            TimeoutError: If OCR4all is still busy after timeout_s seconds.
+            requests.exceptions.RequestException: If polling fails.
+        """
+        with cls._instances_lock:
+            key = (id(session), base_url)
+            monitor = cls._instances.get(key)
+            if monitor is None:
+                monitor = cls._instances[key] = cls(session, base_url, initial_sleep_s, max_sleep_s)
+            min_generation = monitor.retain()
+
+        try:
+            monitor.wait(timeout_s, min_generation)
+        finally:
+            monitor.release()
+
+    def retain(self) -> int:
+        """
+        Registers a waiter, starting or waking the poller. Called with _instances_lock held.
+
+        Returns:
+            The generation of the first result the waiter may use; pass it to wait().
+        """
+        with self._cond:
+            self._refcount += 1
+            # A poll already in flight may have been answered before this call, skip its result
+            min_generation = self._result[0] + (1 if self._poll_state == "idle" else 2)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ocr4all_flow_monitor", daemon=True)
+                self._thread.start()
+            elif self._poll_state == "in_flight":
+                self._poll_state = "stale"
+            else:
+                # Wake the poller so the new waiter gets a fresh result right away
+                self._cond.notify_all()
+            return min_generation
+
+    def release(self) -> None:
+        """ Unregisters a waiter; the poller stops once there are none left. """
+        with self._cond:
+            self._refcount -= 1
+            if self._refcount == 0:
+                self._cond.notify_all()
+
+    def wait(self, timeout_s: float, min_generation: int) -> None:
+        """ Blocks until a result of generation min_generation or later reports OCR4all as idle. """
+        deadline = time.monotonic() + timeout_s
+        with self._cond:
+            while True:
+                generation, cur, error = self._result
+                if generation >= min_generation:
+                    if error is not None:
+                        raise error
+                    if cur == "":
+                        return
+                if time.monotonic() >= deadline:
+                    raise TimeoutError("Timed out waiting for OCR4all process flow to finish")
+                self._cond.wait(deadline - time.monotonic())
+
+    def _run(self) -> None:
+        session, base_url = self._target
+        initial_sleep_s, max_sleep_s = self._sleep_s
+        sleep = initial_sleep_s
+        while True:
+            with self._cond:
+                self._poll_state = "in_flight"
+            try:
+                cur, error = ocr4all_processflow_current(session, base_url), None
+            except Exception as e:
+                cur, error = None, e
+
+            with self._cond:
+                generation, last, _ = self._result
+                if error is None and cur != last:
+                    logger.info(f"OCR4all current: {cur!r}")
+                    sleep = initial_sleep_s
+                    if cur == "":
+                        # Pages may have changed while the flow was running
+                        invalidate_ocr4all_cache(session)
+                self._result = (generation + 1, cur if error is None else last, error)
+                repoll = self._poll_state == "stale"
+                self._poll_state = "idle"
+                self._cond.notify_all()
+
+            if self._stop_if_unused():
+                return
+            if not repoll:
+                with self._cond:
+                    self._cond.wait(sleep)
+            if self._stop_if_unused():
+                return
+            sleep = min(max_sleep_s, sleep * 1.7) + random.uniform(0, 0.25)
+
+    def _stop_if_unused(self) -> bool:
+        session, base_url = self._target
+        with self._instances_lock, self._cond:
+            if self._refcount > 0:
+                return False
+            self._thread = None
+            del self._instances[(id(session), base_url)]
+            return True
+
+
+def _read_head(r: requests.Response, limit: int) -> str:
+    """ Reads at most `limit` bytes of a streamed response body and closes the response. """
+    with r:
+        # Read from the raw stream directly, bypassing r.content/r.text.
+        # Wrap urllib3 errors like requests' iter_content() does.
+        try:
+            head = r.raw.read(limit, decode_content=True)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e) from e
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e) from e
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e) from e
+        except SSLError as e:
+            raise requests.exceptions.SSLError(e) from e
+    return head.decode(r.encoding or "utf-8", errors="replace")
 
 
 def ocr4all_processflow_execute_json(
@@ -265,59 +803,152 @@ def ocr4all_processflow_execute_json(
         timeout_s: float = 3600,
         retries: int = 12,
         retry_sleep_s: float = 2.0,
+        backoff_factor: float = 0.5,
+        preflight: bool = True,
 ) -> None:
     """
     Executes the OCR4all process flow with JSON payload and retries.
 
+    Retries are handled by a urllib3 Retry on a child session sharing cookies and headers
+    with `session` (whose own adapters are left untouched): connection errors, transient
+    HTTP errors and busy responses (409, 423, 500) are retried with exponential backoff,
+    capped at retry_sleep_s, and a server-supplied Retry-After header is respected.
+    Read errors and timeouts are not retried, as the POST may already have been processed.
+
     Args:
-        session: requests.Session with cookies etc.
+        session: requests.Session with cookies etc. (preferably from build_session())
         base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
         page_ids: List of page IDs to process.
         processes: List of process steps to execute.
         process_settings: Dictionary of process settings.
         timeout_s: (optional) HTTP timeout in seconds for each attempt.
         retries: (optional) Number of retries if execution fails.
-        retry_sleep_s: (optional) Sleep time between retries in seconds.
+        retry_sleep_s: (optional) Maximum sleep time between retries in seconds. If OCR4all is busy,
+            wait at most retries * retry_sleep_s seconds for it to finish.
+        backoff_factor: (optional) Backoff factor in seconds between retries (doubles with each retry,
+            up to retry_sleep_s).
+        preflight: (optional) Wait for OCR4all to be idle before posting. Disable to save a
+            round-trip if OCR4all is rarely busy; a busy server is then handled by the retries.
 
     Raises:
-        RuntimeError: If the execution fails after retries.
+        RuntimeError: If OCR4all stays busy or the execution fails after retries.
     """
-    url = f"{base_url}/ajax/processFlow/execute"
+    invalidate_ocr4all_cache(session)
+    url = f"{base_url}{_URL_EXECUTE}"
+
+    payload = _execute_payload(page_ids, processes, process_settings)
+
+    headers = _execute_headers(base_url)
 
-    payload = {
+    # If OCR4All is busy, don't even try
+    if preflight:
+        try:
+            _FlowMonitor.wait_idle(session, base_url, retries * retry_sleep_s)
+        except TimeoutError as e:
+            raise RuntimeError("processFlow/execute failed: OCR4all is busy") from e
+
+    # Send through a child session with a retrying adapter, so the retry policy does not leak
+    # into the caller's session (cookies and headers are shared with it)
+    child = _execute_session(session, base_url, retries, backoff_factor, retry_sleep_s)
+    r = child.post(url, headers=headers, data=_dumps(payload), timeout=timeout_s)
+
+    retry_history = r.raw.retries.history if r.raw is not None and r.raw.retries is not None else ()
+    logger.info(
+        f"processFlow/execute after {len(retry_history)} retries -> HTTP {r.status_code}, len={len(r.text or '')}"
+    )
+
+    if r.status_code == 200:
+        return
+
+    logger.error(f"processFlow/execute failed: HTTP {r.status_code}: {r.text[:1000]}")
+    raise RuntimeError("processFlow/execute failed after retries")
+
+
+def _execute_payload(page_ids: List[str], processes: List[str], process_settings: Dict[str, Any]) -> Dict[str, Any]:
+    """ Returns the JSON body of processFlow/execute. """
+    return {
         "pageIds": page_ids,
         "processesToExecute": processes,
         "processSettings": process_settings,
     }
 
-    headers = {
+
+@functools.lru_cache(maxsize=8)
+def _execute_headers(base_url: str) -> Dict[str, str]:
+    """ Returns the (shared, not to be modified) headers the web UI sends with processFlow/execute. """
+    return {
         "Accept": "application/json",
-        "Content-Type": "application/json",
+        "Content-Type": _JSON_CONTENT_TYPE,
         "X-Requested-With": "XMLHttpRequest",
 
-        "Origin": os.getenv("OCR4ALL_ORIGIN", "http://ocr4all:8080"),
-        "Referer": os.getenv("OCR4ALL_REFERER", f"{base_url}/ProcessFlow"),
+        "Origin": _ORIGIN,
+        "Referer": _REFERER or f"{base_url}/ProcessFlow",
     }
 
-    for attempt in range(1, retries + 1):
-        # If OCR4All is busy, don't even try
-        cur = ocr4all_processflow_current(session, base_url)
-        if cur != "":
-            time.sleep(retry_sleep_s)
-            continue
 
-        r = session.post(url, headers=headers, json=payload, timeout=timeout_s)
+# Status codes OCR4all uses for busy or transient failures of processFlow/execute
+_EXECUTE_RETRY_STATUSES = frozenset((409, 423, 429, 500, 502, 503, 504))
 
-        logger.info(
-            f"processFlow/execute attempt {attempt}/{retries} -> HTTP {r.status_code}, len={len(r.text or '')}"
-        )
+# session -> {(base_url, retries, backoff_factor, backoff_max): child session}
+_EXECUTE_SESSIONS: "weakref.WeakKeyDictionary[requests.Session, Dict[Tuple[Any, ...], requests.Session]]" = \
+    weakref.WeakKeyDictionary()
+_EXECUTE_SESSIONS_LOCK = threading.Lock()
 
-        if r.status_code == 200:
-            return
 
-        logger.error(f"processFlow/execute failed: HTTP {r.status_code}: {r.text[:1000]}")
-        if r.text:
-            logger.error(f"processFlow/execute response head: {r.text[:500]!r}")
-        time.sleep(retry_sleep_s)
+def _execute_session(
+        session: requests.Session,
+        base_url: str,
+        retries: int,
+        backoff_factor: float,
+        backoff_max: float,
+) -> requests.Session:
+    """
+    Returns a (cached) child session for posting to processFlow/execute with retries.
 
-    raise RuntimeError("processFlow/execute failed after retries")
+    The child shares cookies and headers with the parent session and mirrors its
+    other settings. Its adapter is a copy of the parent's adapter for the execute URL
+    (pool configuration included) with the retry policy replaced, and is kept for
+    later calls, so connections are reused.
+    """
+    url = f"{base_url}{_URL_EXECUTE}"
+    key = (base_url, retries, backoff_factor, backoff_max)
+    with _EXECUTE_SESSIONS_LOCK:
+        children = _EXECUTE_SESSIONS.setdefault(session, {})
+        child = children.get(key)
+        if child is None:
+            child = children[key] = requests.Session()
+            parent_adapter = session.get_adapter(url)
+            adapter = copy.copy(parent_adapter) if isinstance(parent_adapter, HTTPAdapter) else HTTPAdapter()
+            adapter.max_retries = _execute_retry(retries, backoff_factor, backoff_max)
+            child.mount(url, adapter)
+
+    child.cookies = session.cookies
+    child.headers = session.headers
+    for attr in ("auth", "proxies", "hooks", "params", "stream", "verify", "cert", "max_redirects", "trust_env"):
+        setattr(child, attr, getattr(session, attr))
+    return child
+
+
+def _execute_retry(retries: int, backoff_factor: float, backoff_max: float) -> Retry:
+    """
+    Returns a Retry for processFlow/execute POSTs.
+
+    Only connection errors and the status codes OCR4all uses for busy or transient failures
+    are retried; read errors are not, as the POST may already have been processed.
+    """
+    class _CappedRetry(Retry):
+        """ Retry with the backoff capped at backoff_max (works with urllib3 1.26 and 2.x). """
+
+        def get_backoff_time(self) -> float:
+            return min(super().get_backoff_time(), backoff_max)
+
+    return _CappedRetry(
+        total=retries,
+        read=False,  # re-raise read errors (e.g. ReadTimeout) unchanged
+        other=0,
+        status_forcelist=_EXECUTE_RETRY_STATUSES,
+        allowed_methods=["POST"],
+        backoff_factor=backoff_factor,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
@@ -0,0 +1,361 @@
+"""
+OCR4All Ajax client (asyncio)
+
+Async counterparts of the helpers in `ocr4all_ajax_utils`, built on aiohttp.
+Payloads, endpoints and retry policies are identical; only the transport differs.
+This allows driving many projects or independent requests concurrently.
+
+Requires the optional dependency `aiohttp`.
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+from urllib3.util.retry import Retry
+from yarl import URL
+
+from .logger import logger
+from .ocr4all_ajax_utils import (
+    OCR4ALL_EXEC_TIMEOUT_S,
+    OCR4ALL_HTTP_TIMEOUT_S,
+    OCR4ALL_WAIT_TIMEOUT_S,
+    _EXECUTE_RETRY_STATUSES,
+    _JSON_CONTENT_TYPE,
+    _SESSION_COOKIES,
+    _URL_CHECKPDF,
+    _URL_CHECK_DIR,
+    _URL_CONVERT_PROJECT_FILES,
+    _URL_CURRENT,
+    _URL_EXECUTE,
+    _URL_INVALIDATE_SESSION,
+    _URL_PAGELIST,
+    _URL_THREADS,
+    _URL_VALIDATE,
+    _URL_VALIDATE_PROJECT,
+    _check_dir_params,
+    _dumps,
+    _execute_headers,
+    _execute_payload,
+    _parse_page_ids,
+    _parse_threads,
+)
+
+OCR4ALL_ASYNC_CONCURRENCY = 32
+
+_HTTP_TIMEOUT = aiohttp.ClientTimeout(total=OCR4ALL_HTTP_TIMEOUT_S)
+
+
+def build_connector(limit_per_host: int = OCR4ALL_ASYNC_CONCURRENCY) -> aiohttp.TCPConnector:
+    """
+    Creates a TCPConnector that can be shared between several ClientSessions.
+
+    Must be called from within a running event loop.
+
+    Args:
+        limit_per_host: (optional) Maximum number of simultaneous connections per host.
+
+    Returns:
+        Configured aiohttp.TCPConnector.
+    """
+    return aiohttp.TCPConnector(limit_per_host=limit_per_host, limit=0, ttl_dns_cache=300)
+
+
+async def ocr4all_open_project_async(
+        session: aiohttp.ClientSession,
+        base_url: str,
+        project_dir: str,
+        image_type: str = "Original",
+        reset_session: bool = True,
+) -> None:
+    """
+    Opens an OCR4all project. See `ocr4all_open_project`.
+
+    Args:
+        session: aiohttp.ClientSession with cookies etc.
+        base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
+        project_dir: Project directory
+        image_type: Image type to use
+        reset_session: Whether to reset session state
+
+    Raises:
+        RuntimeError: If any step fails
+    """
+    # Ensure session cookie exists (skipped if the session was used before)
+    if not any(c.key in _SESSION_COOKIES for c in session.cookie_jar.filter_cookies(URL(f"{base_url}/")).values()):
+        async with session.get(f"{base_url}/", timeout=_HTTP_TIMEOUT) as r:
+            r.raise_for_status()
+
+    # 1) checkDir
+    async with session.get(
+        f"{base_url}{_URL_CHECK_DIR}",
+        params=_check_dir_params(project_dir, image_type, reset_session),
+        timeout=_HTTP_TIMEOUT,
+    ) as r:
+        r.raise_for_status()
+        text = await r.text()
+    if text.strip() != "true":
+        raise RuntimeError(f"ocr4all checkDir returned {text!r} for projectDir={project_dir}")
+
+    # 2) validate
+    async with session.get(f"{base_url}{_URL_VALIDATE}", timeout=_HTTP_TIMEOUT) as r:
+        r.raise_for_status()
+        text = await r.text()
+    if text.strip() != "true":
+        # UI does invalidateSession here
+        async with session.get(f"{base_url}{_URL_INVALIDATE_SESSION}", timeout=_HTTP_TIMEOUT):
+            pass
+        raise RuntimeError(f"ocr4all validate returned {text!r}")
+
+    # 3) validateProject
+    async with session.get(
+        f"{base_url}{_URL_VALIDATE_PROJECT}",
+        params={"projectDir": project_dir, "imageType": image_type},
+        timeout=_HTTP_TIMEOUT,
+    ) as r:
+        r.raise_for_status()
+        text = await r.text()
+    if text.strip() != "true":
+        raise RuntimeError(
+            f"ocr4all validateProject returned:\n {text!r}"
+        )
+
+
+async def ocr4all_open_projects(
+        base_url: str,
+        project_dirs: Iterable[str],
+        image_type: str = "Original",
+        connector: Optional[aiohttp.TCPConnector] = None,
+        max_concurrency: int = OCR4ALL_ASYNC_CONCURRENCY,
+) -> Tuple[Dict[str, aiohttp.ClientSession], aiohttp.TCPConnector]:
+    """
+    Opens several OCR4all projects concurrently.
+
+    OCR4all keeps the opened project in the server-side session, therefore each
+    project gets its own ClientSession (own cookie jar). All sessions share a
+    single connector, which none of them owns. The caller is responsible for
+    closing the returned sessions and the returned connector.
+
+    Args:
+        base_url: Base URL of OCR4all server, e.g. "http://ocr4all:8080"
+        project_dirs: Project directories to open.
+        image_type: (optional) Image type to use.
+        connector: (optional) Shared connector, see build_connector(). Created if not given.
+        max_concurrency: (optional) Maximum number of projects opened at the same time.
+
+    Returns:
+        Mapping of project directory to the ClientSession the project was opened in,
+        and the connector shared by these sessions.
+
+    Raises:
+        RuntimeError: If opening any project fails. All created sessions (and the
+            connector, if it was created here) are closed.
+    """
+    owns_connector = connector is None
+    if connector is None:
+        connector = build_connector()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    sessions = {
+        # unsafe=True: keep cookies from IP-address hosts (e.g. "http://127.0.0.1:8080")
+        project_dir: aiohttp.ClientSession(
+            connector=connector, connector_owner=False, cookie_jar=aiohttp.CookieJar(unsafe=True)
+        )
+        for project_dir in project_dirs
+    }
+
+    async def _open(project_dir: str) -> None:
+        async with semaphore:
+            await ocr4all_open_project_async(sessions[project_dir], base_url, project_dir, image_type)
+
+    try:
+        await asyncio.gather(*(_open(project_dir) for project_dir in sessions))
+    except BaseException:
+        await asyncio.gather(*(s.close() for s in sessions.values()))
+        if owns_connector:
+            await connector.close()
+        raise
+    return sessions, connector
+
+
+async def ocr4all_get_page_ids_async(
+        session: aiohttp.ClientSession,
+        base_url: str,
+        image_type: str = "Binary",
+) -> List[str]:
+    """ Retrieves the list of page IDs for the specified image type. See `ocr4all_get_page_ids`. """
+    async with session.get(
+        f"{base_url}{_URL_PAGELIST}",
+        params={"imageType": image_type},
+        timeout=_HTTP_TIMEOUT,
+    ) as r:
+        r.raise_for_status()
+        content = await r.read()
+    return _parse_page_ids(content)
+
+
+async def ocr4all_threads_async(session: aiohttp.ClientSession, base_url: str) -> int:
+    """ Retrieves the number of threads configured in OCR4all. See `ocr4all_threads`. """
+    async with session.get(f"{base_url}{_URL_THREADS}", timeout=_HTTP_TIMEOUT) as r:
+        r.raise_for_status()
+        text = await r.text()
+    return _parse_threads(text)
+
+
+async def ocr4all_processflow_execute_async(
+        session: aiohttp.ClientSession,
+        base_url: str,
+        page_ids: List[str],
+        processes: List[str],
+        process_settings: Dict[str, Any],
+) -> None:
+    """
+    Executes the OCR4all process flow. See `ocr4all_processflow_execute`.
+
+    Raises:
+        RuntimeError: If the execution fails (HTTP status != 200).
+    """
+    payload = _execute_payload(page_ids, processes, process_settings)
+    async with session.post(
+        f"{base_url}{_URL_EXECUTE}",
+        headers={"Accept": "application/json", "Content-Type": _JSON_CONTENT_TYPE},
+        data=_dumps(payload),
+        timeout=aiohttp.ClientTimeout(total=OCR4ALL_EXEC_TIMEOUT_S),
+    ) as r:
+        if r.status != 200:
+            text = await r.text()
+            raise RuntimeError(f"processFlow/execute failed: HTTP {r.status}: {text[:500]}")
+
+
+async def ocr4all_processflow_wait_async(
+        session: aiohttp.ClientSession,
+        base_url: str,
+        timeout_s: int = OCR4ALL_WAIT_TIMEOUT_S,
+        initial_sleep_s: float = 0.5,
+        max_sleep_s: float = 15.0,
+) -> None:
+    """ Waits for the OCR4all process flow to complete. See `ocr4all_processflow_wait`. """
+    t0 = time.time()
+    last = None
+    sleep = initial_sleep_s
+    while True:
+        cur = await ocr4all_processflow_current_async(session, base_url)
+
+        if cur != last:
+            logger.info(f"OCR4all current: {cur!r}")
+            last = cur
+            sleep = initial_sleep_s
+
+        if cur == "":
+            return
+
+        if time.time() - t0 > timeout_s:
+            raise TimeoutError("Timed out waiting for OCR4all process flow to finish")
+
+        await asyncio.sleep(sleep)
+        sleep = min(max_sleep_s, sleep * 1.7) + random.uniform(0, 0.25)
+
+
+async def ocr4all_checkpdf_async(session: aiohttp.ClientSession, base_url: str) -> bool:
+    """ Checks if the project contains PDF files which need to be converted to images. """
+    async with session.get(f"{base_url}{_URL_CHECKPDF}", timeout=_HTTP_TIMEOUT) as r:
+        r.raise_for_status()
+        text = await r.text()
+    return text.strip().lower() == "true"
+
+
+async def ocr4all_convert_project_files_async(session: aiohttp.ClientSession, base_url: str, delete_blank: bool,
+                                              dpi: int, timeout_s: int = 600) -> str:
+    """
+    Triggers OCR4all PDF -> PNG conversion. See `ocr4all_convert_project_files`.
+
+    Returns:
+        Server response text, or empty string if timeout occurred.
+    """
+    try:
+        async with session.post(
+            f"{base_url}{_URL_CONVERT_PROJECT_FILES}",
+            data={"deleteBlank": str(delete_blank).lower(), "dpi": str(int(dpi))},
+            timeout=aiohttp.ClientTimeout(total=timeout_s),
+        ) as r:
+            r.raise_for_status()
+            return await r.text()
+    except asyncio.TimeoutError:
+        # OCR4all often keeps converting even if the HTTP response doesn't arrive in time.
+        logger.warning(
+            f"convertProjectFiles timed out after {timeout_s}s; assuming conversion continues in background."
+        )
+        return ""
+
+
+async def ocr4all_processflow_current_async(session: aiohttp.ClientSession, base_url: str) -> str:
+    """ Returns current process flow step. Empty string if idle. """
+    async with session.get(f"{base_url}{_URL_CURRENT}", timeout=_HTTP_TIMEOUT) as r:
+        r.raise_for_status()
+        text = await r.text()
+    return text.strip()
+
+
+async def ocr4all_processflow_execute_json_async(
+        session: aiohttp.ClientSession,
+        base_url: str,
+        page_ids: List[str],
+        processes: List[str],
+        process_settings: Dict[str, Any],
+        timeout_s: float = 3600,
+        retries: int = 12,
+        retry_sleep_s: float = 2.0,
+        backoff_factor: float = 0.5,
+        preflight: bool = True,
+) -> None:
+    """
+    Executes the OCR4all process flow with JSON payload and retries. See `ocr4all_processflow_execute_json`.
+
+    Connection errors and busy or transient HTTP errors are retried with exponential backoff,
+    capped at retry_sleep_s; a server-supplied Retry-After header is respected. Read errors
+    and timeouts are not retried, as the POST may already have been processed.
+
+    Raises:
+        RuntimeError: If OCR4all stays busy or the execution fails after retries.
+    """
+    url = f"{base_url}{_URL_EXECUTE}"
+    headers = _execute_headers(base_url)
+    data = _dumps(_execute_payload(page_ids, processes, process_settings))
+    timeout = aiohttp.ClientTimeout(total=timeout_s)
+
+    # If OCR4All is busy, don't even try
+    if preflight:
+        try:
+            await ocr4all_processflow_wait_async(session, base_url, retries * retry_sleep_s)
+        except TimeoutError as e:
+            raise RuntimeError("processFlow/execute failed: OCR4all is busy") from e
+
+    status, text = 0, ""
+    for attempt in range(1, retries + 2):
+        try:
+            async with session.post(url, headers=headers, data=data, timeout=timeout) as r:
+                status = r.status
+                retry_after = r.headers.get("Retry-After")
+                text = await r.text()
+        except aiohttp.ClientConnectorError:
+            # The connection was never established, so the POST was not sent
+            if attempt > retries:
+                raise
+            retry_after = None
+        else:
+            logger.info(f"processFlow/execute attempt {attempt}/{retries + 1} -> HTTP {status}, len={len(text)}")
+            if status == 200:
+                return
+            if status not in _EXECUTE_RETRY_STATUSES or attempt > retries:
+                break
+
+        # Same schedule as urllib3's Retry: Retry-After if given, else no sleep before
+        # the first retry, then exponential backoff
+        if retry_after:
+            await asyncio.sleep(Retry().parse_retry_after(retry_after))
+        elif attempt > 1:
+            await asyncio.sleep(min(retry_sleep_s, backoff_factor * 2 ** (attempt - 1)))
+
+    logger.error(f"processFlow/execute failed: HTTP {status}: {text[:1000]}")
+    raise RuntimeError("processFlow/execute failed after retries")
@@ -0,0 +1,164 @@
+"""
+Tests for the shared processFlow/current poller (_FlowMonitor).
+"""
+import threading
+import time
+
+import pytest
+import requests
+
+from ocr4all_ajax_client import ocr4all_ajax_utils
+from ocr4all_ajax_client.ocr4all_ajax_utils import _FlowMonitor
+
+BASE_URL = "http://ocr4all.invalid:8080"
+
+
+class FakeCurrent:
+    """ Stands in for ocr4all_processflow_current; each poll blocks until released, then returns the next result. """
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.started = threading.Semaphore(0)
+        self.gates = [threading.Event() for _ in results]
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, session, base_url):
+        with self._lock:
+            i = min(self.calls, len(self.results) - 1)
+            self.calls += 1
+            self.threads.add(threading.current_thread())
+        self.started.release()
+        assert self.gates[i].wait(5), "poll was never released"
+        result = self.results[i]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def release_all(self):
+        for gate in self.gates:
+            gate.set()
+
+
+def _refcount(session):
+    monitor = _FlowMonitor._instances.get((id(session), BASE_URL))
+    return 0 if monitor is None else monitor._refcount
+
+
+def _wait_for(predicate, timeout_s=5.0):
+    deadline = time.monotonic() + timeout_s
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def _start_waiter(session, errors, timeout_s=5.0, **kwargs):
+    def run():
+        try:
+            _FlowMonitor.wait_idle(session, BASE_URL, timeout_s, **kwargs)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture(name="session")
+def fixture_session():
+    session = requests.Session()
+    yield session
+    _wait_for(lambda: (id(session), BASE_URL) not in _FlowMonitor._instances)
+
+
+def test_concurrent_waiters_share_one_poller(monkeypatch, session):
+    fake = FakeCurrent("")
+    monkeypatch.setattr(ocr4all_ajax_utils, "ocr4all_processflow_current", fake)
+
+    errors = []
+    waiters = [_start_waiter(session, errors) for _ in range(8)]
+    _wait_for(lambda: _refcount(session) == 8)
+    fake.release_all()
+    for waiter in waiters:
+        waiter.join(5)
+
+    assert not errors
+    assert not any(waiter.is_alive() for waiter in waiters)
+    assert len(fake.threads) == 1
+    # The first poll was in flight when the others arrived, so exactly one more poll serves all of them
+    assert fake.calls == 2
+
+
+def test_waiter_arriving_mid_poll_ignores_in_flight_result(monkeypatch, session):
+    fake = FakeCurrent("", "")
+    monkeypatch.setattr(ocr4all_ajax_utils, "ocr4all_processflow_current", fake)
+
+    errors = []
+    first = _start_waiter(session, errors)
+    assert fake.started.acquire(timeout=5)
+    second = _start_waiter(session, errors)
+    _wait_for(lambda: _refcount(session) == 2)
+
+    fake.gates[0].set()
+    first.join(5)
+    assert not first.is_alive()
+    # The first poll started before the second waiter arrived, so it must wait for the next one
+    assert fake.started.acquire(timeout=5)
+    second.join(0.2)
+    assert second.is_alive()
+
+    fake.gates[1].set()
+    second.join(5)
+    assert not second.is_alive()
+    assert not errors
+
+
+def test_poller_stops_when_last_waiter_leaves(monkeypatch, session):
+    fake = FakeCurrent("")
+    fake.release_all()
+    monkeypatch.setattr(ocr4all_ajax_utils, "ocr4all_processflow_current", fake)
+
+    # A long sleep interval: the poller must stop because it is woken, not because the sleep ends
+    _FlowMonitor.wait_idle(session, BASE_URL, 5, initial_sleep_s=60, max_sleep_s=60)
+
+    (poller,) = fake.threads
+    poller.join(5)
+    assert not poller.is_alive()
+    assert (id(session), BASE_URL) not in _FlowMonitor._instances
+
+
+def test_timeout_while_busy(monkeypatch, session):
+    fake = FakeCurrent("Recognition")
+    fake.release_all()
+    monkeypatch.setattr(ocr4all_ajax_utils, "ocr4all_processflow_current", fake)
+
+    with pytest.raises(TimeoutError):
+        _FlowMonitor.wait_idle(session, BASE_URL, 0.2, initial_sleep_s=0.01, max_sleep_s=0.05)
+    assert fake.calls >= 2
+
+
+def test_timeout_while_poll_hangs(monkeypatch, session):
+    fake = FakeCurrent("")
+    monkeypatch.setattr(ocr4all_ajax_utils, "ocr4all_processflow_current", fake)
+
+    try:
+        with pytest.raises(TimeoutError):
+            _FlowMonitor.wait_idle(session, BASE_URL, 0.2)
+    finally:
+        fake.release_all()
+
+
+def test_poll_error_propagates_to_all_waiters(monkeypatch, session):
+    error = requests.ConnectionError("connection refused")
+    fake = FakeCurrent(error)
+    monkeypatch.setattr(ocr4all_ajax_utils, "ocr4all_processflow_current", fake)
+
+    errors = []
+    waiters = [_start_waiter(session, errors) for _ in range(3)]
+    _wait_for(lambda: _refcount(session) == 3)
+    fake.release_all()
+    for waiter in waiters:
+        waiter.join(5)
+
+    assert errors == [error] * 3